@@ -13,11 +13,12 @@ Basic IOT over BLE advertisements.
 """
 
 import os
+import random
 import struct
 import time
 
 import adafruit_ble
-from adafruit_ble.advertising import Advertisement, LazyObjectField
+from adafruit_ble.advertising import Advertisement, LazyObjectField, encode_data
 from adafruit_ble.advertising.adafruit import (
     ADAFRUIT_COMPANY_ID,
     MANUFACTURING_DATA_ADT,
@@ -36,22 +37,258 @@ __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_BLE_BroadcastNet.
 
 _ble = adafruit_ble.BLERadio()
 _sequence_number = 0
+# A random boot id until set_boot_count is called so that a restart still looks like one.
+_boot_count = random.getrandbits(8)
+_trace = None
+
+_SEQUENCE_NUMBER_KEY = 0x0003
+REPAIR_KEY = 0x0004
+"""Manufacturer data key of the repair packets sent by ``broadcast(measurement, repair=True)``."""
+_SEQUENCE_EXTENSION_KEY = 0x0005
+_TIMESTAMP_KEY = 0x0006
+_SEQUENCE_EXTENSION_SIZE = 6
 
 
 def broadcast(
-    measurement: "AdafruitSensorMeasurement", *, broadcast_time: float = 0.1, extended: bool = False
+    measurement: "AdafruitSensorMeasurement",
+    *,
+    broadcast_time: float = 0.1,
+    extended: bool = False,
+    jitter: float = 0,
+    repair: bool = False,
+    scan_response: bool = False,
+    wide_sequence: bool = False,
 ) -> None:
     """Broadcasts the given measurement for the given broadcast time. If extended is False and the
     measurement would be too long, it will be split into multiple measurements for transmission,
     each with the given broadcast time.
+
+    If jitter is non-zero, a random delay of up to jitter seconds is added before each
+    transmission so that sensors that happen to wake together drift out of each other's way.
+
+    If repair is True and the measurement is split, parity packets are broadcast after the
+    fragments so that a bridge using `adafruit_ble_broadcastnet_bridge.FragmentRecovery` can
+    rebuild any single lost fragment.
+
+    If scan_response is True and extended is False, fragments are sent in pairs, the second one
+    as the scan response of the first with the same sequence number. This halves the number of
+    broadcasts for bridges that scan actively and merge the two with
+    `adafruit_ble_broadcastnet_bridge.ScanResponseMerger`. Bridges that scan passively only
+    receive every other fragment, so leave it off for them.
+
+    If wide_sequence is True, every packet also carries
+    `AdafruitSensorMeasurement.sequence_extension` so that bridges using
+    `adafruit_ble_broadcastnet_bridge.SequenceTracker` can count missed packets beyond 255 and
+    detect reboots. It costs six bytes per packet. Combined with
+    `AdafruitSensorMeasurement.timestamp`, only single value fields fit in a legacy packet.
+
+    Raises ValueError, before anything is broadcast, if a field doesn't fit in a packet.
     """
     global _sequence_number  # noqa: PLW0603
-    for submeasurement in measurement.split(252 if extended else 31):
-        submeasurement.sequence_number = _sequence_number
-        _ble.start_advertising(submeasurement, scan_response=None)
+    trace = _trace
+    if trace:
+        start = time.monotonic_ns()
+    submeasurements = build_packets(
+        measurement,
+        sequence_number=_sequence_number,
+        extended=extended,
+        repair=repair,
+        scan_response=scan_response,
+        wide_sequence=wide_sequence,
+    )
+    if trace:
+        trace("split", time.monotonic_ns() - start)
+        trace("fragments", len(submeasurements))
+    submeasurements = iter(submeasurements)
+    for submeasurement in submeasurements:
+        response = None
+        if scan_response and not extended:
+            response = next(submeasurements, None)
+        if jitter:
+            time.sleep(random.random() * jitter)
+        if trace:
+            trace("fragment_bytes", len(bytes(submeasurement)))
+            if response:
+                trace("fragment_bytes", len(bytes(response)))
+            start = time.monotonic_ns()
+        _ble.start_advertising(submeasurement, scan_response=response)
+        if trace:
+            now = time.monotonic_ns()
+            trace("start_advertising", now - start)
+            start = now
         time.sleep(broadcast_time)
+        if trace:
+            now = time.monotonic_ns()
+            trace("sleep", now - start)
+            start = now
         _ble.stop_advertising()
-        _sequence_number = (_sequence_number + 1) % 256
+        if trace:
+            trace("stop_advertising", time.monotonic_ns() - start)
+        _sequence_number = (_sequence_number + 1) % 0x1000000
+
+
+def build_packets(
+    measurement: "AdafruitSensorMeasurement",
+    *,
+    sequence_number: int = 0,
+    extended: bool = False,
+    repair: bool = False,
+    scan_response: bool = False,
+    wide_sequence: bool = False,
+) -> list:
+    """Returns the list of packets that `broadcast` sends for the given measurement with the
+    given options, numbered from the given 24-bit sequence number. With scan_response, the
+    packets come in pairs that share a sequence number. The given measurement isn't changed.
+    `broadcast` uses it, and it can be used to size or simulate broadcasts without a radio."""
+    if repair and scan_response:
+        raise ValueError("repair and scan_response can't be used together")
+    max_packet_size = 252 if extended else 31
+    if wide_sequence:
+        max_packet_size -= _SEQUENCE_EXTENSION_SIZE
+    packets = list(measurement.split(max_packet_size))
+    if packets[0] is measurement:
+        # Number a copy when the measurement fits in one packet.
+        packets[0] = measurement.__class__()
+        packets[0].manufacturer_data.data.update(measurement.manufacturer_data.data)
+    if repair:
+        packets = _add_repair(packets, sequence_number & 0xFF, max_packet_size)
+    paired = scan_response and not extended
+    for i, packet in enumerate(packets):
+        number = (sequence_number + (i // 2 if paired else i)) % 0x1000000
+        packet.sequence_number = number & 0xFF
+        if wide_sequence:
+            packet.sequence_extension = (_boot_count, number >> 8)
+    return packets
+
+
+def uptime_ms() -> int:
+    """Returns the time since boot in milliseconds, wrapped to 32 bits, for
+    `AdafruitSensorMeasurement.timestamp`."""
+    return time.monotonic_ns() // 1_000_000 & 0xFFFFFFFF
+
+
+def set_boot_count(boot_count: int) -> None:
+    """Sets the boot count sent with wide sequence numbers. Store a count that is incremented
+    at every start, for example in ``microcontroller.nvm``, and set it before broadcasting so
+    that bridges can tell a reboot from lost packets. Only the lowest eight bits are sent.
+    Without it, a random boot id is sent instead, which differs between boots most of the time."""
+    global _boot_count  # noqa: PLW0603
+    _boot_count = boot_count & 0xFF
+
+
+def set_trace(hook) -> None:
+    """Sets a function that `broadcast` calls as ``hook(event, value)`` to report how it spends
+    its time, or None to stop tracing. Durations are in nanoseconds. The events are:
+
+    * ``split``: time to split the measurement and build any repair packets.
+    * ``fragments``: number of packets the measurement was split into.
+    * ``fragment_bytes``: encoded size of each packet.
+    * ``start_advertising``, ``sleep`` and ``stop_advertising``: time spent in each phase of
+      every packet's broadcast.
+
+    When no hook is set, `broadcast` only pays for a few None checks. A `TraceBuffer` can be used
+    as the hook.
+    """
+    global _trace  # noqa: PLW0603
+    _trace = hook
+
+
+class TraceBuffer:
+    """Keeps the most recent trace events from `broadcast` so they can be printed over serial
+    later:
+
+    .. code-block:: python
+
+        trace_buffer = adafruit_ble_broadcastnet.TraceBuffer()
+        adafruit_ble_broadcastnet.set_trace(trace_buffer)
+        adafruit_ble_broadcastnet.broadcast(measurement)
+        trace_buffer.dump()
+
+    :param int size: Number of events kept.
+    """
+
+    def __init__(self, size: int = 64) -> None:
+        self._events = [None] * size
+        self._values = [0] * size
+        self._next = 0
+        self.count = 0
+        """Total number of events recorded, including those that have been overwritten."""
+
+    def __call__(self, event: str, value: int) -> None:
+        self._events[self._next] = event
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._events)
+        self.count += 1
+
+    def events(self) -> list:
+        """Returns the kept (event, value) tuples from oldest to newest."""
+        size = len(self._events)
+        kept = min(self.count, size)
+        return [
+            (self._events[i % size], self._values[i % size])
+            for i in range(self._next - kept, self._next)
+        ]
+
+    def clear(self) -> None:
+        """Forgets all events."""
+        self._next = 0
+        self.count = 0
+
+    def dump(self) -> None:
+        """Prints the kept events, one per line."""
+        for event, value in self.events():
+            print(event, value)
+
+
+def _crc16(data, crc=0xFFFF):
+    """CRC-16/CCITT of the given bytes, continuing from the given crc."""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1) & 0xFFFF
+    return crc
+
+
+def burst_crc(payloads, length: int) -> int:
+    """CRC-16 of the given fragment payloads, each zero padded to the given length, as carried in
+    repair packets. Bridges use it to check that fragments belong to the same burst."""
+    crc = 0xFFFF
+    for payload in payloads:
+        crc = _crc16(payload, crc)
+        crc = _crc16(bytes(length - len(payload)), crc)
+    return crc
+
+
+def _add_repair(submeasurements, first_sequence_number, max_packet_size):
+    """Returns a list of the given submeasurements followed by the repair packets that protect
+    them. The parity is computed right away from the submeasurements as they are now."""
+    submeasurements = list(submeasurements)
+    count = len(submeasurements)
+    if count < 2:
+        return submeasurements
+    payloads = [submeasurement.fragment_bytes() for submeasurement in submeasurements]
+    parity = bytearray(max(len(payload) for payload in payloads))
+    for payload in payloads:
+        for i, b in enumerate(payload):
+            parity[i] ^= b
+    # Each repair packet carries the first sequence number and fragment count of the burst, the
+    # chunk index and chunk total, the parity length and a CRC of the whole burst so the bridge
+    # can tell it apart from an earlier burst with the same sequence numbers. The rest of the
+    # packet holds as much of the parity as fits.
+    header = struct.pack("<BBBBH", first_sequence_number, count, 0, len(parity), 0)
+    chunk_size = max_packet_size - 11 - len(header)
+    total = (len(parity) + chunk_size - 1) // chunk_size
+    crc = burst_crc(payloads, len(parity))
+    for index in range(total):
+        repair_packet = AdafruitSensorMeasurement()
+        repair_packet.manufacturer_data.data[REPAIR_KEY] = (
+            struct.pack(
+                "<BBBBH", first_sequence_number, count, index << 4 | total, len(parity), crc
+            )
+            + parity[index * chunk_size : (index + 1) * chunk_size]
+        )
+        submeasurements.append(repair_packet)
+    return submeasurements
 
 
 # This line causes issues with Sphinx, so we won't run it in the CI
@@ -67,6 +304,79 @@ if not hasattr(os, "environ") or (
         """Device address as a string."""
 
 
+class BroadcastTimer:
+    """Paces a sensor's reports so that many sensors sharing the same interval don't collide.
+
+    The interval is divided into ``slots`` and each device reports in the slot derived from its
+    address, plus up to ``jitter`` seconds of random delay. By default each slot is four times
+    ``report_time`` long and the jitter keeps the report inside its slot, so devices in different
+    slots never overlap. Devices that share a slot overlap in about half of the intervals. Random
+    addresses share slots about as often as random report times collide, so to keep every device
+    apart, number them from zero and pass the number as a hex string in ``address``. That only
+    works while there are no more devices than slots. ``ble_broadcastnet_timer_simulation.py`` in
+    the examples compares the options for a given number of sensors. Report times
+    are scheduled from the previous deadline rather than from when `wait` was called, so time
+    spent reading sensors and broadcasting doesn't make the schedule drift. Use it in place of
+    ``time.sleep(interval)``:
+
+    .. code-block:: python
+
+        timer = adafruit_ble_broadcastnet.BroadcastTimer(60)
+        while True:
+            timer.wait()
+            measurement = adafruit_ble_broadcastnet.AdafruitSensorMeasurement()
+            ...
+            adafruit_ble_broadcastnet.broadcast(measurement)
+
+    :param float interval: Seconds between reports.
+    :param float report_time: Seconds each report is on the air, the ``broadcast_time`` of
+        `broadcast` times the number of packets the measurement is split into.
+    :param int slots: Number of slots the interval is divided into. Defaults to as many slots of
+        four times ``report_time`` as fit in the interval.
+    :param float jitter: Maximum random delay in seconds added to each report. Defaults to the
+        slot width minus ``report_time``.
+    :param str address: Hex address used to pick the slot. Defaults to `device_address`.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        report_time: float = 0.1,
+        slots: Optional[int] = None,
+        jitter: Optional[float] = None,
+        address: Optional[str] = None,
+    ) -> None:
+        if address is None:
+            address = device_address
+        if slots is None:
+            slots = max(1, int(interval / (4 * report_time)))
+        if jitter is None:
+            jitter = max(0, interval / slots - report_time)
+        self._interval = int(interval * 1_000_000_000)
+        self._jitter = jitter
+        self.slot = int(address, 16) % slots
+        """The slot within each interval used by this device."""
+        now = time.monotonic_ns()
+        # Align the first report to the start of our slot in the current interval.
+        self._deadline = now - now % self._interval + self.slot * self._interval // slots
+        if self._deadline < now:
+            self._deadline += self._interval
+
+    def wait(self) -> None:
+        """Sleeps until this device's next report time."""
+        now = time.monotonic_ns()
+        if now > self._deadline:
+            # We overran one or more intervals. Skip them but keep our slot.
+            missed = (now - self._deadline) // self._interval + 1
+            self._deadline += missed * self._interval
+        delay = (self._deadline - now) / 1_000_000_000
+        if self._jitter:
+            delay += random.random() * self._jitter
+        time.sleep(delay)
+        self._deadline += self._interval
+
+
 class AdafruitSensorMeasurement(Advertisement):
     """A collection of sensor measurements."""
 
@@ -87,6 +397,21 @@ class AdafruitSensorMeasurement(Advertisement):
     sequence_number = ManufacturerDataField(0x0003, "<B")
     """Sequence number of the measurement. Used to detect missed packets."""
 
+    sequence_extension = ManufacturerDataField(0x0005, "<BH", ("boot_count", "high"))
+    """Optional (boot_count, high) tuple that widens `sequence_number` to 24 bits. ``high`` holds
+    the upper 16 bits and ``boot_count`` changes whenever the sensor restarts."""
+
+    timestamp = ManufacturerDataField(0x0006, "<L")
+    """Optional sensor uptime in milliseconds when the reading was taken, as returned by
+    `uptime_ms`. Copied into every packet when the measurement is split. Bridges align it to their
+    own clock with `adafruit_ble_broadcastnet_bridge.ClockAligner`.
+
+    The timestamp takes seven bytes of every packet. Together with the six bytes of
+    ``wide_sequence``, a legacy packet only has room for a single value field, so fields with
+    several values, such as ``temperature`` pairs or ``acceleration``, make `broadcast` raise
+    ValueError. Use ``extended=True`` or
+    leave one of them off for such measurements."""
+
     acceleration = ManufacturerDataField(0x0A00, "<fff", ("x", "y", "z"))
     """Acceleration as (x, y, z) tuple of floats in meters per second per second."""
 
@@ -175,22 +500,41 @@ class AdafruitSensorMeasurement(Advertisement):
 
     def split(self, max_packet_size: int = 31) -> "AdafruitSensorMeasurement":
         """Split the measurement into multiple measurements with the given max_packet_size. Yields
-        each submeasurement."""
-        current_size = 8  # baseline for mfg data and sequence number
-        if current_size + len(self.manufacturer_data) < max_packet_size:
+        each submeasurement. Raises ValueError if a single field can't fit in a packet."""
+        original_data = self.manufacturer_data.data
+        # Each entry takes a length byte and a two byte key on top of its value.
+        fields = [
+            key
+            for key in original_data
+            if key not in {_SEQUENCE_NUMBER_KEY, _SEQUENCE_EXTENSION_KEY, _TIMESTAMP_KEY}
+        ]
+        # Every submeasurement carries the timestamp so that each can be placed in time.
+        timestamp = original_data.get(_TIMESTAMP_KEY)
+        baseline = 8  # baseline for mfg data and sequence number
+        if timestamp is not None:
+            baseline += 3 + len(timestamp)
+        # Check every field before yielding so that nothing is broadcast for a measurement that
+        # can't be sent.
+        for key in fields:
+            if baseline + 3 + len(original_data[key]) > max_packet_size:
+                raise ValueError(
+                    f"Field 0x{key:04x} is too large for a {max_packet_size} byte packet"
+                )
+        if baseline + sum(3 + len(original_data[key]) for key in fields) <= max_packet_size:
             yield self
             return
 
-        original_data = self.manufacturer_data.data
         submeasurement = None
-        for key in original_data:
+        for key in fields:
             value = original_data[key]
-            entry_size = 2 + len(value)
+            entry_size = 3 + len(value)
             if not submeasurement or current_size + entry_size > max_packet_size:
                 if submeasurement:
                     yield submeasurement
                 submeasurement = self.__class__()
-                current_size = 8
+                current_size = baseline
+                if timestamp is not None:
+                    submeasurement.manufacturer_data.data[_TIMESTAMP_KEY] = timestamp
             submeasurement.manufacturer_data.data[key] = value
             current_size += entry_size
 
@@ -198,3 +542,114 @@ class AdafruitSensorMeasurement(Advertisement):
             yield submeasurement
 
         return
+
+    def fragment_bytes(self) -> bytes:
+        """The encoded manufacturer data without the sequence number and its extension, with keys
+        in ascending order. This is what repair packets protect."""
+        data = self.manufacturer_data.data
+        return b"".join(
+            encode_data({key: data[key]}, key_encoding="<H")
+            for key in sorted(data)
+            if key not in {_SEQUENCE_NUMBER_KEY, _SEQUENCE_EXTENSION_KEY}
+        )
+
+
+class FieldScheduler:
+    """Picks which fields of an oversized measurement to broadcast each cycle so that important
+    fields go out every cycle and slow changing ones take turns in the remaining space. Each
+    cycle's packet is filled with the fields of period one first, then the other due fields in
+    order of period, most overdue first among equal periods, and never needs to be split. A field
+    that has waited twice its period goes ahead of the other slower fields so that large fields
+    aren't starved by smaller, more frequent ones. The timestamp, when set, is sent in every
+    packet:
+
+    .. code-block:: python
+
+        scheduler = adafruit_ble_broadcastnet.FieldScheduler({"pressure": 4, "magnetic": 2})
+        while True:
+            measurement = adafruit_ble_broadcastnet.AdafruitSensorMeasurement()
+            ...
+            packet = scheduler.select(measurement)
+            if packet:
+                adafruit_ble_broadcastnet.broadcast(packet)
+
+    :param dict periods: Maps attribute names to how often, in cycles, the field should be sent.
+        Fields not listed have a period of one and are sent every cycle.
+    :param int max_packet_size: Size of the packet built each cycle. Subtract six bytes when
+        broadcasting with ``wide_sequence=True``.
+    :param type measurement_class: The `AdafruitSensorMeasurement` class or subclass that
+        defines the fields named in periods.
+    """
+
+    def __init__(
+        self,
+        periods: Optional[dict] = None,
+        *,
+        max_packet_size: int = 31,
+        measurement_class: Optional[type] = None,
+    ) -> None:
+        if measurement_class is None:
+            measurement_class = AdafruitSensorMeasurement
+        self._periods = {}
+        if periods:
+            for name, period in periods.items():
+                self._periods[getattr(measurement_class, name)._key] = period
+        self._max_packet_size = max_packet_size
+        self._last_sent = {}
+        self._cycle = 0
+
+    def select(
+        self, measurement: "AdafruitSensorMeasurement"
+    ) -> Optional["AdafruitSensorMeasurement"]:
+        """Returns a measurement with the fields to send this cycle, or None if no due field
+        fits. Raises ValueError if a field can never fit in a packet next to the fields sent
+        every cycle."""
+        self._cycle += 1
+        data = measurement.manufacturer_data.data
+        timestamp = data.get(_TIMESTAMP_KEY)
+        size = 8  # baseline for mfg data and sequence number
+        if timestamp is not None:
+            size += 3 + len(timestamp)
+        keys = [
+            key
+            for key in data
+            if key not in {_SEQUENCE_NUMBER_KEY, _SEQUENCE_EXTENSION_KEY, _TIMESTAMP_KEY}
+        ]
+        # Space taken by the fields sent every cycle, which slower fields must fit next to.
+        every_cycle = sum(3 + len(data[key]) for key in keys if self._periods.get(key, 1) == 1)
+        due = []
+        for key in keys:
+            period = self._periods.get(key, 1)
+            entry_size = 3 + len(data[key])
+            if size + entry_size + (every_cycle if period > 1 else 0) > self._max_packet_size:
+                raise ValueError(
+                    f"Field 0x{key:04x} doesn't fit in a {self._max_packet_size} byte packet "
+                    "next to the fields sent every cycle"
+                )
+            if key in self._last_sent:
+                overdue = (self._cycle - self._last_sent[key]) / period
+                if overdue < 1:
+                    continue
+            else:
+                overdue = max(1, self._cycle / period)
+            # Fields that have waited twice their period jump ahead of the other slower fields so
+            # they aren't starved, but never ahead of the fields sent every cycle.
+            due.append((period > 1, period if overdue < 2 else 0, -overdue, key))
+        if not due:
+            return None
+        due.sort()
+
+        packet = measurement.__class__()
+        if timestamp is not None:
+            packet.manufacturer_data.data[_TIMESTAMP_KEY] = timestamp
+        sent = False
+        for _, _, _, key in due:
+            entry_size = 3 + len(data[key])
+            # Fields that don't fit stay due and will be further ahead next cycle.
+            if size + entry_size > self._max_packet_size:
+                continue
+            packet.manufacturer_data.data[key] = data[key]
+            self._last_sent[key] = self._cycle
+            size += entry_size
+            sent = True
+        return packet if sent else None
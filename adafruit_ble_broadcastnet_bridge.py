@@ -0,0 +1,859 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_ble_broadcastnet_bridge`
+================================================================================
+
+Helpers for bridges that receive BroadcastNet measurements and pass them on.
+
+* Author(s): Adafruit Industries
+"""
+
+import struct
+import time
+from array import array
+from collections import namedtuple
+
+from adafruit_ble.advertising import decode_data
+from adafruit_ble.advertising.standard import ManufacturerDataField
+
+import adafruit_ble_broadcastnet
+from adafruit_ble_broadcastnet import REPAIR_KEY, AdafruitSensorMeasurement, burst_crc
+
+try:
+    from typing import Optional
+except ImportError:
+    pass
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_BLE_BroadcastNet.git"
+
+
+class ScanResponseMerger:
+    """Merges the advertisement and scan response halves of measurements sent with
+    ``broadcast(measurement, scan_response=True)``. Pass every received measurement to `add` and
+    handle the measurements it returns instead:
+
+    .. code-block:: python
+
+        merger = adafruit_ble_broadcastnet_bridge.ScanResponseMerger()
+        for received in ble.start_scan(adafruit_ble_broadcastnet.AdafruitSensorMeasurement):
+            for measurement in merger.add(received):
+                print(measurement)
+
+    Advertisements are held until their scan response arrives. If it doesn't arrive within
+    ``timeout`` seconds, for example because the sensor doesn't use scan responses, the
+    advertisement is returned on its own by a later call.
+
+    :param float timeout: Seconds to wait for a scan response.
+    """
+
+    def __init__(self, timeout: float = 0.5) -> None:
+        self._timeout = timeout
+        self._pending = {}
+
+    def add(self, measurement: AdafruitSensorMeasurement) -> list:
+        """Records the given measurement and returns the measurements that are complete."""
+        now = time.monotonic()
+        ready = []
+        address = bytes(measurement.address.address_bytes)
+        pending = self._pending.get(address)
+        if measurement.scan_response:
+            if pending and pending[0].sequence_number == measurement.sequence_number:
+                del self._pending[address]
+                measurement = self._merge(pending[0], measurement)
+            # A scan response whose advertisement we missed still holds a complete fragment.
+            ready.append(measurement)
+        elif not pending or pending[0].sequence_number != measurement.sequence_number:
+            if pending:
+                ready.append(pending[0])
+            self._pending[address] = (measurement, now)
+
+        for other_address in [a for a, p in self._pending.items() if now - p[1] > self._timeout]:
+            ready.append(self._pending.pop(other_address)[0])
+        return ready
+
+    @staticmethod
+    def _merge(advertisement, response):
+        merged = advertisement.__class__()
+        merged.manufacturer_data.data.update(response.manufacturer_data.data)
+        merged.manufacturer_data.data.update(advertisement.manufacturer_data.data)
+        merged.address = advertisement.address
+        merged._rssi = advertisement.rssi
+        return merged
+
+
+class SequenceTracker:
+    """Tracks the sequence number of each sensor so that bridges can skip repeated broadcasts and
+    count missed packets. Uses
+    `adafruit_ble_broadcastnet.AdafruitSensorMeasurement.sequence_extension` when the sensor sends
+    it, which also reveals reboots, and the 8-bit
+    `adafruit_ble_broadcastnet.AdafruitSensorMeasurement.sequence_number` otherwise:
+
+    .. code-block:: python
+
+        tracker = adafruit_ble_broadcastnet_bridge.SequenceTracker()
+        for measurement in ble.start_scan(adafruit_ble_broadcastnet.AdafruitSensorMeasurement):
+            number_missed = tracker.missed(sensor_address, measurement)
+            # Skip if we are getting the same broadcast more than once.
+            if number_missed is None:
+                continue
+            ...
+            tracker.update(sensor_address, measurement)
+    """
+
+    def __init__(self) -> None:
+        self._last = {}
+
+    @staticmethod
+    def _sequence(measurement):
+        extension = measurement.sequence_extension
+        if extension is None:
+            return None, measurement.sequence_number
+        return extension[0], extension[1] << 8 | measurement.sequence_number
+
+    def missed(self, sensor_address: str, measurement: AdafruitSensorMeasurement) -> Optional[int]:
+        """Returns the number of packets missed between the last measurement recorded with
+        `update` and the given one, or None if the given one is a repeat."""
+        if sensor_address not in self._last:
+            return 0
+        last_boot_count, last_sequence = self._last[sensor_address]
+        boot_count, sequence = self._sequence(measurement)
+        if boot_count is None or last_boot_count is None:
+            difference = (sequence - last_sequence) % 0x100
+        elif boot_count != last_boot_count:
+            # The sensor restarted and counts from zero again.
+            return sequence
+        else:
+            difference = (sequence - last_sequence) % 0x1000000
+            # A jump this far is a restart that happened to reuse the boot id.
+            if difference > 0x800000:
+                return sequence
+        if difference == 0:
+            return None
+        return difference - 1
+
+    def update(self, sensor_address: str, measurement: AdafruitSensorMeasurement) -> None:
+        """Records the given measurement as the latest one handled for the sensor."""
+        self._last[sensor_address] = self._sequence(measurement)
+
+
+class FragmentRecovery:
+    """Rebuilds a lost fragment of a split measurement from the repair packets sent by
+    ``broadcast(measurement, repair=True)``, without waiting for a retransmission. Pass every
+    received measurement to `add`:
+
+    .. code-block:: python
+
+        recovery = adafruit_ble_broadcastnet_bridge.FragmentRecovery()
+        for measurement in ble.start_scan(adafruit_ble_broadcastnet.AdafruitSensorMeasurement):
+            recovered = recovery.add(measurement)
+            if recovered:
+                print("recovered", recovered)
+
+    :param int history: Number of fragments and bursts remembered per sensor.
+    """
+
+    def __init__(self, history: int = 16) -> None:
+        self._history = history
+        self._sensors = {}
+
+    def add(self, measurement: AdafruitSensorMeasurement) -> Optional[AdafruitSensorMeasurement]:
+        """Records the given measurement. Returns the rebuilt fragment when this measurement
+        completes the information needed to recover a lost one, otherwise None."""
+        address = bytes(measurement.address.address_bytes)
+        if address not in self._sensors:
+            self._sensors[address] = ({}, {})
+        fragments, repairs = self._sensors[address]
+        sequence_number = measurement.sequence_number
+        data = measurement.manufacturer_data.data
+        if REPAIR_KEY in data:
+            value = data[REPAIR_KEY]
+            if len(value) < 6:
+                return None
+            # The burst is identified by its first sequence number, count, length and CRC.
+            header = struct.unpack_from("<BBBBH", value)
+            burst = header[:2] + header[3:]
+            chunk = header[2]
+            if burst not in repairs:
+                repairs[burst] = {}
+            repairs[burst][chunk >> 4] = (chunk & 0x0F, bytes(value[6:]))
+        else:
+            fragments[sequence_number] = measurement.fragment_bytes()
+        self._prune(fragments, sequence_number)
+        self._prune(repairs, sequence_number)
+
+        for burst, chunks in repairs.items():
+            total = next(iter(chunks.values()))[0]
+            if len(chunks) != total or any(index not in chunks for index in range(total)):
+                continue
+            recovered = self._recover(burst, chunks, fragments)
+            # The burst is settled either way, so forget it and every fragment up to its end.
+            del repairs[burst]
+            last = (burst[0] + burst[1] - 1) % 256
+            for stale in [key for key in fragments if (last - key) % 256 < 128]:
+                del fragments[stale]
+            if recovered is None:
+                return None
+            recovered.address = measurement.address
+            extension = measurement.sequence_extension
+            if extension is not None:
+                # The lost fragment was sent shortly before this packet, so borrow from the
+                # high bits if the low byte wrapped in between.
+                borrow = 1 if recovered.sequence_number > sequence_number else 0
+                recovered.sequence_extension = (
+                    extension[0],
+                    (extension[1] - borrow) & 0xFFFF,
+                )
+            return recovered
+        return None
+
+    def _prune(self, entries, sequence_number):
+        while len(entries) > self._history:
+            # Drop the entry furthest behind the newest sequence number.
+            oldest = max(
+                entries,
+                key=lambda key: (
+                    (sequence_number - (key[0] if isinstance(key, tuple) else key)) % 256
+                ),
+            )
+            del entries[oldest]
+
+    @staticmethod
+    def _recover(burst, chunks, fragments):
+        first, count, length, crc = burst
+        parity = bytearray(b"".join(chunks[index][1] for index in range(len(chunks))))
+        if len(parity) != length:
+            return None
+        missing = None
+        for i in range(count):
+            sequence_number = (first + i) % 256
+            if sequence_number not in fragments:
+                if missing is not None:
+                    return None
+                missing = sequence_number
+                continue
+            fragment = fragments[sequence_number]
+            # A longer fragment can't be part of this burst.
+            if len(fragment) > length:
+                return None
+            for j, b in enumerate(fragment):
+                parity[j] ^= b
+        if missing is None:
+            return None
+        # Check that the fragments we hold really belong to this burst, for example after the
+        # sensor restarted and reused the sequence numbers.
+        payloads = [
+            parity if (first + i) % 256 == missing else fragments[(first + i) % 256]
+            for i in range(count)
+        ]
+        if burst_crc(payloads, length) != crc:
+            return None
+        recovered = AdafruitSensorMeasurement(sequence_number=missing)
+        # Zero padding past the end of the fragment decodes as the end of the data.
+        recovered.manufacturer_data.data.update(decode_data(parity, key_encoding="<H"))
+        return recovered
+
+
+class BridgeCoordinator:
+    """Decides which of several bridges that hear the same sensor uploads its readings, so that
+    each reading is uploaded once. Every bridge shares its link quality to each sensor through a
+    common ``backend`` and the bridge with the best recent RSSI and loss owns the sensor. When
+    the owner stops reporting for ``timeout`` seconds, the next best bridge takes over.
+
+    Readings are identified by their wide sequence number when the sensor sends one and by the
+    8-bit sequence number otherwise. Other bridges hold on to the readings they hear and upload
+    the ones the owner hasn't claimed within ``grace`` seconds, which are returned by `overdue`.
+    A bridge that fails to upload a reading it claimed calls `release` so that it is retried.
+
+    The backend is any object with these methods, where ``now`` is wall clock time shared by all
+    bridges:
+
+    * ``update(sensor, bridge, score, now)`` records a bridge's current score for a sensor.
+    * ``scores(sensor, since)`` returns a dict of bridge to score for reports newer than since.
+    * ``claim(sensor, reading, now, since)`` returns True only for the first claim of a reading
+      since the given time. ``reading`` is an integer.
+    * ``release(sensor, reading)`` removes the claim of a reading.
+
+    :param backend: Shared ownership and deduplication state.
+    :param str bridge_address: Address of this bridge. Defaults to
+        `adafruit_ble_broadcastnet.device_address`.
+    :param float timeout: Seconds after which a silent bridge loses ownership.
+    :param float loss_penalty: Score penalty in dB for a bridge that misses every packet.
+    :param float smoothing: Weight of the newest sample in the RSSI and loss averages.
+    :param float claim_expiry: Seconds a claim is kept. Keep it shorter than the time a sensor
+        takes to send 256 readings, so that a reused 8-bit sequence number isn't refused.
+    :param float grace: Seconds other bridges wait for the owner to claim a reading.
+    """
+
+    def __init__(
+        self,
+        backend,
+        bridge_address: Optional[str] = None,
+        *,
+        timeout: float = 60,
+        loss_penalty: float = 30,
+        smoothing: float = 0.2,
+        claim_expiry: float = 10,
+        grace: float = 2,
+    ) -> None:
+        self._backend = backend
+        self.bridge_address = bridge_address or adafruit_ble_broadcastnet.device_address
+        """Address of this bridge."""
+        self._timeout = timeout
+        self._loss_penalty = loss_penalty
+        self._smoothing = smoothing
+        self._claim_expiry = claim_expiry
+        self._grace = grace
+        self._links = {}
+        self._held = {}
+        self._claimed = {}
+
+    def observe(self, sensor_address: str, rssi: int, number_missed: int = 0) -> None:
+        """Updates and shares this bridge's link quality to the given sensor."""
+        loss = number_missed / (number_missed + 1)
+        if sensor_address in self._links:
+            average_rssi, average_loss = self._links[sensor_address]
+            average_rssi += self._smoothing * (rssi - average_rssi)
+            average_loss += self._smoothing * (loss - average_loss)
+        else:
+            average_rssi, average_loss = rssi, loss
+        self._links[sensor_address] = (average_rssi, average_loss)
+        score = average_rssi - self._loss_penalty * average_loss
+        self._backend.update(sensor_address, self.bridge_address, score, time.time())
+
+    def owner(self, sensor_address: str) -> Optional[str]:
+        """Returns the address of the bridge that currently owns the given sensor."""
+        scores = self._backend.scores(sensor_address, time.time() - self._timeout)
+        if not scores:
+            return None
+        # Break ties by address so every bridge picks the same owner.
+        return max(scores, key=lambda bridge: (scores[bridge], bridge))
+
+    @staticmethod
+    def _reading(measurement):
+        extension = measurement.sequence_extension
+        if extension is None:
+            return measurement.sequence_number
+        return extension[0] << 24 | extension[1] << 8 | measurement.sequence_number
+
+    def should_upload(self, sensor_address: str, measurement: AdafruitSensorMeasurement) -> bool:
+        """Returns True when this bridge owns the sensor and no bridge has claimed the given
+        reading yet. Otherwise the reading is held in case the owner doesn't claim it."""
+        reading = self._reading(measurement)
+        now = time.time()
+        if self.owner(sensor_address) == self.bridge_address:
+            if self._backend.claim(sensor_address, reading, now, now - self._claim_expiry):
+                self._claimed[(sensor_address, reading)] = now
+                return True
+            return False
+        self._held[(sensor_address, reading)] = (measurement, now, now)
+        return False
+
+    def overdue(self) -> list:
+        """Returns a list of (sensor address, measurement) tuples for held readings that the
+        owner didn't claim within the grace period, claimed for this bridge to upload instead.
+        Call it regularly. Readings heard longer ago than the claim expiry are dropped."""
+        now = time.time()
+        for key, heard in list(self._claimed.items()):
+            if now - heard >= self._claim_expiry:
+                del self._claimed[key]
+        ready = []
+        for key, (measurement, held, heard) in list(self._held.items()):
+            if now - held < self._grace:
+                continue
+            del self._held[key]
+            if now - heard >= self._claim_expiry:
+                # The owner's claim may have expired already.
+                continue
+            sensor_address, reading = key
+            if self._backend.claim(sensor_address, reading, now, now - self._claim_expiry):
+                self._claimed[key] = heard
+                ready.append((sensor_address, measurement))
+        return ready
+
+    def release(self, sensor_address: str, measurement: AdafruitSensorMeasurement) -> None:
+        """Removes this bridge's claim of a reading it failed to upload and holds the reading
+        again, so that `overdue` returns it for another try after the grace period. Readings are
+        retried until the claim expiry has passed since they were first heard."""
+        reading = self._reading(measurement)
+        key = (sensor_address, reading)
+        now = time.time()
+        self._backend.release(sensor_address, reading)
+        self._held[key] = (measurement, now, self._claimed.pop(key, now))
+
+
+class FeedSerializer:
+    """Converts measurements into the JSON body of an Adafruit IO group data request. The feed
+    keys for each combination of fields are computed once and the body is written into a
+    reusable buffer in a single pass.
+
+    Feed keys match those the bridges have always used: the attribute name with dashes, the
+    index of the value and, for values with several elements, the element name. For example
+    ``temperature-0`` and ``acceleration-0-x``. Only sensor fields (keys 0x0A00 and up) are
+    serialized.
+
+    :param type measurement_class: The `adafruit_ble_broadcastnet.AdafruitSensorMeasurement`
+        class or subclass whose fields are serialized.
+    :param int buffer_size: Initial size of the output buffer. It grows as needed.
+    """
+
+    def __init__(
+        self,
+        measurement_class: Optional[type] = None,
+        buffer_size: int = 512,
+    ) -> None:
+        if measurement_class is None:
+            measurement_class = AdafruitSensorMeasurement
+        self._fields = {}
+        for attribute in dir(measurement_class):
+            attribute_instance = getattr(measurement_class, attribute)
+            if issubclass(attribute_instance.__class__, ManufacturerDataField):
+                if attribute_instance._key >= 0x0A00:
+                    self._fields[attribute_instance._key] = (attribute, attribute_instance)
+        self._layouts = {}
+        self._buffer = bytearray(buffer_size)
+        self._length = 0
+
+    def _layout(self, data):
+        layout_key = tuple((key, len(data[key])) for key in data)
+        if layout_key in self._layouts:
+            return self._layouts[layout_key]
+        layout = []
+        for key, length in layout_key:
+            if key not in self._fields:
+                continue
+            attribute, attribute_instance = self._fields[key]
+            name = attribute.replace("_", "-")
+            entry_length = attribute_instance._entry_length
+            for i in range(length // entry_length):
+                outputs = []
+                for j in range(attribute_instance.element_count):
+                    feed_key = name + "-" + str(i)
+                    if attribute_instance.element_count > 1:
+                        feed_key += "-" + attribute_instance.field_names[j]
+                    prefix = ',{"key":"' + feed_key + '","value":'
+                    outputs.append((j, prefix.encode("utf-8"), feed_key))
+                layout.append((key, i * entry_length, attribute_instance._format, outputs))
+        self._layouts[layout_key] = layout
+        return layout
+
+    def items(self, measurement: AdafruitSensorMeasurement):
+        """Yields a (feed key, value) tuple for every value in the given measurement."""
+        data = measurement.manufacturer_data.data
+        for key, offset, value_format, outputs in self._layout(data):
+            values = struct.unpack_from(value_format, data[key], offset)
+            for index, _, feed_key in outputs:
+                yield feed_key, values[index]
+
+    def feed_keys(self, measurement: AdafruitSensorMeasurement) -> list:
+        """Returns the feed keys for the values in the given measurement."""
+        return [
+            feed_key
+            for _, _, _, outputs in self._layout(measurement.manufacturer_data.data)
+            for _, _, feed_key in outputs
+        ]
+
+    def serialize(
+        self,
+        measurement: AdafruitSensorMeasurement,
+        *,
+        missed_message_count: Optional[int] = None,
+        created_at: Optional[str] = None,
+    ) -> memoryview:
+        """Returns the JSON request body for the given measurement. The returned memoryview is
+        only valid until the next call.
+
+        :param int missed_message_count: If given, also reported to the ``missed-message-count``
+            feed.
+        :param str created_at: If given, the ISO 8601 time Adafruit IO records for the data
+            instead of the time it is received.
+        """
+        self._length = 0
+        self._write(b'{"feeds":[')
+        if missed_message_count is not None:
+            self._write(b',{"key":"missed-message-count","value":')
+            self._write(str(missed_message_count).encode("utf-8"))
+            self._write(b"}")
+        data = measurement.manufacturer_data.data
+        for key, offset, value_format, outputs in self._layout(data):
+            values = struct.unpack_from(value_format, data[key], offset)
+            for index, prefix, _ in outputs:
+                self._write(prefix)
+                self._write(repr(values[index]).encode("utf-8"))
+                self._write(b"}")
+        self._write(b"]")
+        if created_at is not None:
+            self._write(b',"created_at":"')
+            self._write(created_at.encode("utf-8"))
+            self._write(b'"')
+        self._write(b"}")
+        # Every entry starts with a comma. Blank out the one before the first entry.
+        if self._buffer[10] == ord(","):
+            self._buffer[10] = ord(" ")
+        return memoryview(self._buffer)[: self._length]
+
+    def _write(self, data):
+        end = self._length + len(data)
+        if end > len(self._buffer):
+            buffer = bytearray(max(end, 2 * len(self._buffer)))
+            buffer[: self._length] = self._buffer[: self._length]
+            self._buffer = buffer
+        self._buffer[self._length : end] = data
+        self._length = end
+
+
+WindowStats = namedtuple(
+    "WindowStats", ("count", "min", "max", "mean", "last", "variance", "complete")
+)
+"""Statistics of the readings in one window. The variance is the population variance. complete is
+False when part of the window wasn't covered, because it started before the aggregator did or
+because `WindowedAggregator.ready` was called late."""
+
+
+class WindowedAggregator:
+    """Rolls readings up per sensor and feed into windowed statistics so that bridges can upload
+    one summary per window instead of every reading. Memory use per sensor feed is fixed by the
+    number of panes in the window, not by the number of readings.
+
+    Windows are ``window`` seconds long and a new one is reported every ``hop`` seconds. With the
+    default hop, windows are tumbling. A smaller hop gives sliding windows, so a one minute window
+    with a ten second hop reports every ten seconds on the last minute of readings. Values with
+    several elements, such as ``acceleration``, are aggregated per element using the feed keys of
+    `FeedSerializer`:
+
+    .. code-block:: python
+
+        aggregator = adafruit_ble_broadcastnet_bridge.WindowedAggregator(60, passthrough=("color",))
+        for measurement in ble.start_scan(adafruit_ble_broadcastnet.AdafruitSensorMeasurement):
+            for feed_key, value in aggregator.add(sensor_address, measurement):
+                print("raw", sensor_address, feed_key, value)
+            for sensor_address, feed_key, stats in aggregator.ready():
+                print(sensor_address, feed_key, stats.mean)
+
+    `ready` must be called at least once per hop. Only the newest panes are kept, so windows that
+    ended more than one hop before the call are skipped and a window that overlaps dropped panes
+    is reported with ``complete`` set to False.
+
+    :param float window: Length of each window in seconds.
+    :param float hop: Seconds between reported windows. Must divide the window evenly.
+    :param passthrough: Attribute names of fields that are returned raw by `add` instead of being
+        aggregated.
+    :param FeedSerializer serializer: Used to split measurements into feed values.
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        *,
+        hop: Optional[float] = None,
+        passthrough=(),
+        serializer: Optional[FeedSerializer] = None,
+    ) -> None:
+        self._hop = hop or window
+        self._panes = round(window / self._hop)
+        self._prefixes = tuple(name.replace("_", "-") + "-" for name in passthrough)
+        self._passthrough = {}
+        self._serializer = serializer or FeedSerializer()
+        self._keys = {}
+        self._reported_pane = None
+        self._first_pane = None
+
+    def add(
+        self,
+        sensor_address: str,
+        measurement: AdafruitSensorMeasurement,
+        now: Optional[float] = None,
+    ) -> list:
+        """Adds the values in the given measurement to the current windows. Returns the
+        (feed key, value) tuples of passthrough fields."""
+        pane = int((time.monotonic() if now is None else now) // self._hop)
+        if self._reported_pane is None:
+            self._reported_pane = pane - 1
+            self._first_pane = pane
+        raw = []
+        for feed_key, value in self._serializer.items(measurement):
+            if feed_key not in self._passthrough:
+                self._passthrough[feed_key] = any(
+                    feed_key.startswith(prefix) for prefix in self._prefixes
+                )
+            if self._passthrough[feed_key]:
+                raw.append((feed_key, value))
+                continue
+            key = (sensor_address, feed_key)
+            if key not in self._keys:
+                # Each pane is [pane number, count, mean, M2, min, max, last]. One extra pane
+                # holds new readings until the window before it has been reported.
+                self._keys[key] = [[None, 0, 0.0, 0.0, 0, 0, 0] for _ in range(self._panes + 1)]
+            stats = self._keys[key][pane % (self._panes + 1)]
+            if stats[0] != pane:
+                stats[:] = [pane, 0, 0.0, 0.0, value, value, value]
+            # Welford's online mean and variance.
+            stats[1] += 1
+            delta = value - stats[2]
+            stats[2] += delta / stats[1]
+            stats[3] += delta * (value - stats[2])
+            stats[4] = min(stats[4], value)
+            stats[5] = max(stats[5], value)
+            stats[6] = value
+        return raw
+
+    def ready(self, now: Optional[float] = None) -> list:
+        """Returns a (sensor address, feed key, `WindowStats`) tuple for every sensor feed with
+        readings in each window that has ended since the last call."""
+        pane = int((time.monotonic() if now is None else now) // self._hop)
+        if self._reported_pane is None:
+            self._reported_pane = pane - 1
+            self._first_pane = pane
+            return []
+        results = []
+        # A window is reported when the pane that ends it is complete. Only panes from
+        # pane - self._panes onwards are still held.
+        for last_pane in range(max(self._reported_pane + 1, pane - self._panes), pane):
+            first_pane = last_pane - self._panes + 1
+            complete = first_pane >= max(self._first_pane, pane - self._panes)
+            for (sensor_address, feed_key), panes in self._keys.items():
+                stats = self._merge(panes, first_pane, last_pane, complete)
+                if stats:
+                    results.append((sensor_address, feed_key, stats))
+        self._reported_pane = pane - 1
+        # Forget feeds that have gone quiet for a whole window.
+        first_pane = pane - self._panes + 1
+        for key in [key for key, panes in self._keys.items() if not self._merge(panes, first_pane)]:
+            del self._keys[key]
+        return results
+
+    @staticmethod
+    def _merge(panes, first_pane, last_pane=None, complete=True):
+        count = 0
+        mean = m2 = 0.0
+        minimum = maximum = last = last_number = None
+        for number, pane_count, pane_mean, pane_m2, pane_min, pane_max, pane_last in panes:
+            if (
+                number is None
+                or number < first_pane
+                or (last_pane is not None and number > last_pane)
+            ):
+                continue
+            # Chan's parallel combination of the pane means and variances.
+            total = count + pane_count
+            delta = pane_mean - mean
+            mean += delta * pane_count / total
+            m2 += pane_m2 + delta * delta * count * pane_count / total
+            count = total
+            minimum = pane_min if minimum is None else min(minimum, pane_min)
+            maximum = pane_max if maximum is None else max(maximum, pane_max)
+            if last_number is None or number > last_number:
+                last, last_number = pane_last, number
+        if not count:
+            return None
+        return WindowStats(count, minimum, maximum, mean, last, m2 / count, complete)
+
+
+class MeasurementIndex:
+    """Keeps the latest value and a fixed number of recent samples of every sensor feed seen by a
+    bridge so that local consumers can query them without scanning or asking the cloud. Samples
+    are stored in preallocated arrays, so memory use is fixed per sensor feed:
+
+    .. code-block:: python
+
+        index = adafruit_ble_broadcastnet_bridge.MeasurementIndex()
+        for measurement in ble.start_scan(adafruit_ble_broadcastnet.AdafruitSensorMeasurement):
+            index.add(sensor_address, measurement)
+            print(index.latest("temperature"))
+
+    Feeds are named with the keys of `FeedSerializer`, such as ``temperature-0``.
+
+    :param int history: Number of samples kept per sensor feed.
+    :param FeedSerializer serializer: Used to split measurements into feed values.
+    """
+
+    def __init__(self, history: int = 64, serializer: Optional[FeedSerializer] = None) -> None:
+        self._history = history
+        self._serializer = serializer or FeedSerializer()
+        # Each series is [times, values, next index, count].
+        self._series = {}
+        self._fields = {}
+
+    def add(
+        self,
+        sensor_address: str,
+        measurement: AdafruitSensorMeasurement,
+        now: Optional[float] = None,
+    ) -> None:
+        """Records the values in the given measurement at the given time, which defaults to
+        ``time.time()``."""
+        if now is None:
+            now = time.time()
+        for feed_key, value in self._serializer.items(measurement):
+            key = (sensor_address, feed_key)
+            series = self._series.get(key)
+            if series is None:
+                empty = [0] * self._history
+                series = [array("d", empty), array("f", empty), 0, 0]
+                self._series[key] = series
+                field = self._field(feed_key)
+                if field not in self._fields:
+                    self._fields[field] = {}
+                if sensor_address not in self._fields[field]:
+                    self._fields[field][sensor_address] = []
+                self._fields[field][sensor_address].append(feed_key)
+            i = series[2]
+            series[0][i] = now
+            series[1][i] = value
+            series[2] = (i + 1) % self._history
+            series[3] = min(series[3] + 1, self._history)
+
+    @staticmethod
+    def _field(feed_key):
+        # The field name is everything before the value index.
+        pieces = feed_key.split("-")
+        for i, piece in enumerate(pieces):
+            if piece.isdigit():
+                return "-".join(pieces[:i])
+        return feed_key
+
+    def sensors(self) -> list:
+        """Returns the addresses of all sensors in the index."""
+        return list({sensor_address for sensor_address, _ in self._series})
+
+    def latest(self, field: str) -> dict:
+        """Returns the newest samples of the given field, such as ``temperature`` or
+        ``battery_voltage``, for every sensor as a dict of sensor address to a dict of feed key to
+        (time, value)."""
+        sensors = self._fields.get(field.replace("_", "-"), {})
+        result = {}
+        for sensor_address, feed_keys in sensors.items():
+            result[sensor_address] = {}
+            for feed_key in feed_keys:
+                times, values, i, _ = self._series[(sensor_address, feed_key)]
+                i = (i - 1) % self._history
+                result[sensor_address][feed_key] = (times[i], values[i])
+        return result
+
+    def history(self, sensor_address: str, feed_key: str, since: Optional[float] = None) -> list:
+        """Returns the kept (time, value) samples of the given sensor feed from oldest to newest,
+        optionally only those taken after the given time."""
+        series = self._series.get((sensor_address, feed_key))
+        if series is None:
+            return []
+        times, values, i, count = series
+        samples = []
+        for j in range(i - count, i):
+            k = j % self._history
+            if since is None or times[k] > since:
+                samples.append((times[k], values[k]))
+        return samples
+
+
+class ClockAligner:
+    """Maps the `adafruit_ble_broadcastnet.AdafruitSensorMeasurement.timestamp` of each sensor
+    onto the bridge's clock. The offset between the two clocks is estimated from the packets that
+    arrive soonest after being taken, and is allowed to creep by ``drift`` seconds per second to
+    follow crystal drift. A sensor's estimate is reset when it restarts, which is detected from its
+    boot count, from its uptime going back or from the offset jumping by more than
+    ``reset_after`` seconds.
+
+    :param float drift: Maximum relative clock drift to follow.
+    :param float reset_after: Offset jump in seconds treated as a restart.
+    """
+
+    def __init__(self, drift: float = 0.0001, reset_after: float = 60) -> None:
+        self._drift = drift
+        self._reset_after = reset_after
+        # Each sensor has [offset, last received, newest raw timestamp, wraps, boot count].
+        self._sensors = {}
+
+    def taken_at(
+        self,
+        sensor_address: str,
+        measurement: AdafruitSensorMeasurement,
+        received: Optional[float] = None,
+    ) -> Optional[float]:
+        """Returns the time in the bridge's clock when the given measurement was taken, or None
+        when it has no timestamp.
+
+        :param float received: Time the measurement was received. Defaults to ``time.time()``.
+        """
+        raw = measurement.timestamp
+        if raw is None:
+            return None
+        if received is None:
+            received = time.time()
+        extension = measurement.sequence_extension
+        boot_count = None if extension is None else extension[0]
+        state = self._sensors.get(sensor_address)
+        wraps = 0
+        if state is not None and boot_count == state[4]:
+            wraps = state[3]
+            back = state[2] - raw
+            if back > 0x80000000:
+                # The 32-bit millisecond counter wrapped.
+                wraps += 1
+                state[2] = raw
+                state[3] = wraps
+            elif back < -0x80000000:
+                # A late packet from before the last wrap.
+                wraps -= 1
+            elif back > 1000:
+                # Uptime went back more than reordering explains.
+                state = None
+            elif back < 0:
+                state[2] = raw
+        sensor_time = (wraps * 0x100000000 + raw) / 1000
+        offset = received - sensor_time
+        if state is not None and offset - state[0] > self._reset_after:
+            state = None
+        if state is None or boot_count != state[4]:
+            state = [offset, received, raw, 0, boot_count]
+            self._sensors[sensor_address] = state
+            sensor_time = raw / 1000
+            offset = received - sensor_time
+        # Keep the smallest offset seen, which has the least transmission delay in it.
+        state[0] = min(offset, state[0] + self._drift * (received - state[1]))
+        state[1] = received
+        return sensor_time + state[0]
+
+
+class LatencyHistogram:
+    """Counts latencies, such as sample age or end-to-end delay, in fixed buckets.
+
+    :param bounds: Upper bounds of the buckets in seconds, in increasing order. Latencies above
+        the last bound go into an overflow bucket.
+    """
+
+    def __init__(self, bounds=(0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30, 60)) -> None:
+        self.bounds = tuple(bounds)
+        """Upper bounds of the buckets in seconds."""
+        self.counts = [0] * (len(self.bounds) + 1)
+        """Number of latencies in each bucket. The last is the overflow bucket."""
+        self.total = 0
+        """Total number of latencies added."""
+
+    def add(self, latency: float) -> None:
+        """Adds the given latency in seconds."""
+        i = 0
+        while i < len(self.bounds) and latency > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += 1
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the upper bound of the bucket holding the given percentile, None if no
+        latencies were added or infinity if it is the overflow bucket."""
+        if not self.total:
+            return None
+        target = self.total * percent / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return self.bounds[i] if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def __str__(self) -> str:
+        parts = [f"<={bound}s:{count}" for bound, count in zip(self.bounds, self.counts)]
+        parts.append(f">{self.bounds[-1]}s:{self.counts[-1]}")
+        return "<{} {} >".format(self.__class__.__name__, " ".join(parts))
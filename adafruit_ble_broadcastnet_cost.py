@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_ble_broadcastnet_cost`
+================================================================================
+
+Estimates of the airtime and charge that broadcasting measurements takes, for sizing sensors
+before deploying them. It runs anywhere adafruit_ble_broadcastnet imports, including CPython.
+
+* Author(s): Adafruit Industries
+"""
+
+from collections import namedtuple
+
+from adafruit_ble_broadcastnet import AdafruitSensorMeasurement, build_packets
+
+try:
+    from typing import Optional
+except ImportError:
+    pass
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_BLE_BroadcastNet.git"
+
+
+RadioProfile = namedtuple(
+    "RadioProfile", ("tx_current", "ramp_time", "active_current", "sleep_current")
+)
+"""Current draw used by `estimate_cost`. ``tx_current`` is drawn for ``ramp_time`` seconds
+before and while each packet is on air, ``active_current`` for the rest of the broadcast time and
+``sleep_current`` between reports. Currents are in milliamps."""
+
+NRF52840_PROFILE = RadioProfile(
+    tx_current=6.4, ramp_time=0.00014, active_current=1.0, sleep_current=0.05
+)
+"""Rough figures for an nRF52840 transmitting at 0 dBm from its LDO regulator while CircuitPython
+waits in ``time.sleep``. Measure your own board for accurate estimates."""
+
+BroadcastCost = namedtuple(
+    "BroadcastCost",
+    ("packets", "bytes_on_air", "advertising_events", "airtime", "charge", "average_current"),
+)
+"""Result of `estimate_cost`. ``packets`` is the number of broadcast windows per report,
+``bytes_on_air`` and ``airtime`` (seconds) cover every transmission of every packet,
+``advertising_events`` is per packet, ``charge`` is per report in millicoulombs and
+``average_current`` is in milliamps, or None without a report interval."""
+
+
+def estimate_cost(
+    measurement: AdafruitSensorMeasurement,
+    *,
+    broadcast_time: float = 0.1,
+    extended: bool = False,
+    repair: bool = False,
+    scan_response: bool = False,
+    wide_sequence: bool = False,
+    advertising_interval: float = 0.1,
+    report_interval: Optional[float] = None,
+    profile: RadioProfile = NRF52840_PROFILE,
+) -> BroadcastCost:
+    """Estimates the airtime and charge used to `adafruit_ble_broadcastnet.broadcast` the given
+    measurement with the given options, without using the radio. Packets are counted with
+    `adafruit_ble_broadcastnet.build_packets`, the way `adafruit_ble_broadcastnet.broadcast` sends
+    them. With scan_response, every scan response is assumed to be requested once per advertising
+    event.
+
+    :param float advertising_interval: Interval between advertising events.
+        `adafruit_ble_broadcastnet.broadcast` uses the ``BLERadio.start_advertising`` default of
+        0.1 seconds.
+    :param float report_interval: Seconds between reports, used for the average current.
+    :param RadioProfile profile: Current draw of the device.
+    """
+    packets = build_packets(
+        measurement,
+        extended=extended,
+        repair=repair,
+        scan_response=scan_response,
+        wide_sequence=wide_sequence,
+    )
+    # The controller adds 0 to 10 ms of random delay to each advertising interval.
+    events = 1 + int(broadcast_time / (advertising_interval + 0.005))
+    # Preamble, access address, PDU header and CRC around each PDU.
+    overhead = 10
+    transmissions = 0
+    bytes_on_air = 0
+    broadcasts = len(packets)
+    if scan_response and not extended:
+        broadcasts = (broadcasts + 1) // 2
+        for packet in packets[1::2]:
+            # SCAN_RSP with the advertiser address on one channel.
+            bytes_on_air += events * (overhead + 6 + len(bytes(packet)))
+            transmissions += events
+        packets = packets[::2]
+    for packet in packets:
+        length = len(bytes(packet))
+        if extended:
+            # ADV_EXT_IND on each primary channel pointing to one AUX_ADV_IND with the data.
+            bytes_on_air += events * (3 * (overhead + 7) + overhead + 10 + length)
+            transmissions += 4 * events
+        else:
+            # ADV_NONCONN_IND with the advertiser address on each primary channel.
+            bytes_on_air += events * 3 * (overhead + 6 + length)
+            transmissions += 3 * events
+    airtime = bytes_on_air * 8 / 1_000_000
+    duration = broadcasts * broadcast_time
+    radio_time = airtime + transmissions * profile.ramp_time
+    charge = radio_time * profile.tx_current + (duration - radio_time) * profile.active_current
+    average_current = None
+    if report_interval:
+        sleep_time = max(0, report_interval - duration)
+        average_current = (charge + sleep_time * profile.sleep_current) / report_interval
+    return BroadcastCost(broadcasts, bytes_on_air, events, airtime, charge, average_current)
+
+
+def sweep(measurement: AdafruitSensorMeasurement, configurations, **defaults) -> list:
+    """Estimates the cost of broadcasting the given measurement with each configuration, a dict
+    of `estimate_cost` keyword arguments that override the given defaults. Returns a list of
+    (configuration, `BroadcastCost`) tuples sorted by charge:
+
+    .. code-block:: python
+
+        configurations = [
+            {"broadcast_time": 0.1},
+            {"broadcast_time": 0.5},
+            {"broadcast_time": 0.1, "extended": True},
+        ]
+        for configuration, cost in adafruit_ble_broadcastnet_cost.sweep(
+            measurement, configurations, report_interval=60
+        ):
+            print(configuration, cost.packets, cost.average_current)
+    """
+    results = []
+    for configuration in configurations:
+        options = dict(defaults)
+        options.update(configuration)
+        results.append((configuration, estimate_cost(measurement, **options)))
+    results.sort(key=lambda result: result[1].charge)
+    return results
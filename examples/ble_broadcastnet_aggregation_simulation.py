@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+"""This example measures, without any sensors, how much adafruit_ble_broadcastnet_bridge's
+WindowedAggregator cuts what a bridge sends upstream. It feeds an hour of simulated readings from
+several sensors through tumbling and sliding windows and counts the requests, values and bytes
+that would be posted, compared with posting every reading. Passing battery voltage through raw
+posts it on every reading, so those rows show what one raw field costs. Run it on a Raspberry Pi
+or other Blinka computer."""
+
+import json
+import random
+
+import adafruit_ble_broadcastnet
+import adafruit_ble_broadcastnet_bridge
+
+SENSORS = 10
+REPORT_INTERVAL = 5
+DURATION = 3600
+# Statistics posted for each aggregated feed.
+STATISTICS = ("mean", "min", "max")
+# (window, hop, passthrough) for each way of aggregating.
+WINDOWS = (
+    (60, None, ()),
+    (60, None, ("battery_voltage",)),
+    (60, 10, ()),
+    (300, None, ()),
+    (300, None, ("battery_voltage",)),
+)
+
+serializer = adafruit_ble_broadcastnet_bridge.FeedSerializer()
+
+
+def readings():
+    """Yields (time, sensor address, measurement) in time order."""
+    events = []
+    for sensor in range(SENSORS):
+        start = random.random() * REPORT_INTERVAL
+        for i in range(int(DURATION / REPORT_INTERVAL)):
+            events.append((start + i * REPORT_INTERVAL, f"{sensor:012x}"))
+    events.sort()
+    for now, sensor_address in events:
+        measurement = adafruit_ble_broadcastnet.AdafruitSensorMeasurement()
+        measurement.temperature = (20 + random.random(), 21 + random.random())
+        measurement.acceleration = (random.random(), random.random(), 9.8)
+        measurement.battery_voltage = 3700 + random.randrange(100)
+        yield now, sensor_address, measurement
+
+
+def raw_volume():
+    requests = values = size = 0
+    for _, _, measurement in readings():
+        requests += 1
+        values += len(serializer.feed_keys(measurement))
+        size += len(serializer.serialize(measurement))
+    return requests, values, size
+
+
+def post_size(feeds):
+    return len(json.dumps({"feeds": [{"key": key, "value": value} for key, value in feeds]}))
+
+
+def aggregated_volume(window, hop, passthrough):
+    aggregator = adafruit_ble_broadcastnet_bridge.WindowedAggregator(
+        window, hop=hop, passthrough=passthrough, serializer=serializer
+    )
+    requests = values = size = 0
+    for now, sensor_address, measurement in readings():
+        raw = aggregator.add(sensor_address, measurement, now=now)
+        if raw:
+            requests += 1
+            values += len(raw)
+            size += post_size(raw)
+        # Post one request per sensor for every window that ends.
+        posts = {}
+        for address, feed_key, stats in aggregator.ready(now=now):
+            feeds = posts.setdefault(address, [])
+            for statistic in STATISTICS:
+                feeds.append((f"{feed_key}-{statistic}", getattr(stats, statistic)))
+        for feeds in posts.values():
+            requests += 1
+            values += len(feeds)
+            size += post_size(feeds)
+    return requests, values, size
+
+
+raw = raw_volume()
+print(f"{SENSORS} sensors reporting every {REPORT_INTERVAL} s for {DURATION} s")
+print("upload                          requests   values     bytes")
+print(f"every reading                   {raw[0]:8}  {raw[1]:7}  {raw[2]:8}")
+for window, hop, passthrough in WINDOWS:
+    volume = aggregated_volume(window, hop, passthrough)
+    label = f"{window} s window" + (f", {hop} s hop" if hop else "")
+    if passthrough:
+        label += ", raw battery"
+    print(
+        f"{label:30}  {volume[0]:8}  {volume[1]:7}  {volume[2]:8}  "
+        f"{volume[2] / raw[2] * 100:.0f}% of the bytes"
+    )
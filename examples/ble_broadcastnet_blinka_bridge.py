@@ -8,10 +8,10 @@ from os import getenv
 
 import adafruit_ble
 import requests
-from adafruit_ble.advertising.standard import ManufacturerDataField
 from adafruit_blinka import load_settings_toml
 
 import adafruit_ble_broadcastnet
+import adafruit_ble_broadcastnet_bridge
 
 # Get Adafruit IO keys, ensure these are setup in settings.toml
 # (visit io.adafruit.com if you need to create an account, or if you need your Adafruit IO key.)
@@ -20,6 +20,7 @@ aio_username = getenv("ADAFRUIT_AIO_USERNAME")
 aio_key = getenv("ADAFRUIT_AIO_KEY")
 
 aio_auth_header = {"X-AIO-KEY": aio_key}
+aio_data_header = {"X-AIO-KEY": aio_key, "Content-Type": "application/json"}
 aio_base_url = f"https://io.adafruit.com/api/v2/{aio_username}"
 
 
@@ -53,8 +54,10 @@ def create_feed(group_key, name):
     return response.json()["key"]
 
 
-def create_data(group_key, data):
-    response = aio_post(f"/groups/{group_key}/data", json={"feeds": data})
+def create_data(group_key, body):
+    response = requests.post(
+        aio_base_url + f"/groups/{group_key}/data", data=bytes(body), headers=aio_data_header
+    )
     if response.status_code == 429:
         print("Throttled!")
         return False
@@ -65,28 +68,6 @@ def create_data(group_key, data):
     return True
 
 
-def convert_to_feed_data(values, attribute_name, attribute_instance):
-    feed_data = []
-    # Wrap single value entries for enumeration.
-    if not isinstance(values, tuple) or (
-        attribute_instance.element_count > 1 and not isinstance(values[0], tuple)
-    ):
-        values = (values,)
-    for i, value in enumerate(values):
-        key = attribute_name.replace("_", "-") + "-" + str(i)
-        if isinstance(value, tuple):
-            for j in range(attribute_instance.element_count):
-                feed_data.append(
-                    {
-                        "key": key + "-" + attribute_instance.field_names[j],
-                        "value": value[j],
-                    }
-                )
-        else:
-            feed_data.append({"key": key, "value": value})
-    return feed_data
-
-
 ble = adafruit_ble.BLERadio()
 bridge_address = adafruit_ble_broadcastnet.device_address
 print("This is BroadcastNet bridge:", bridge_address)
@@ -112,51 +93,77 @@ for group in response.json():
 
 print(existing_feeds)
 
+serializer = adafruit_ble_broadcastnet_bridge.FeedSerializer()
+
 print("scanning")
 print()
-sequence_numbers = {}
+sequence_tracker = adafruit_ble_broadcastnet_bridge.SequenceTracker()
+# Missed counts seen on repair packets, which aren't posted, wait for the next measurement.
+carried_missed = {}
+# Rebuilds a lost fragment of a split measurement from the sensor's repair packets.
+fragment_recovery = adafruit_ble_broadcastnet_bridge.FragmentRecovery()
+# Sensors that set measurement.timestamp get their data recorded at the time it was taken.
+clock_aligner = adafruit_ble_broadcastnet_bridge.ClockAligner()
+sample_ages = adafruit_ble_broadcastnet_bridge.LatencyHistogram()
+end_to_end_latencies = adafruit_ble_broadcastnet_bridge.LatencyHistogram()
+# Scan responses carry the same sequence number as their advertisement so join them up
+# before checking the sequence number.
+scan_response_merger = adafruit_ble_broadcastnet_bridge.ScanResponseMerger()
 # By providing Advertisement as well we include everything, not just specific advertisements.
-for measurement in ble.start_scan(
+for advertisement in ble.start_scan(
     adafruit_ble_broadcastnet.AdafruitSensorMeasurement, interval=0.5
 ):
-    reversed_address = [measurement.address.address_bytes[i] for i in range(5, -1, -1)]
-    sensor_address = "{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}".format(*reversed_address)
-    if sensor_address not in sequence_numbers:
-        sequence_numbers[sensor_address] = measurement.sequence_number - 1 % 256
-    # Skip if we are getting the same broadcast more than once.
-    if measurement.sequence_number == sequence_numbers[sensor_address]:
-        continue
-    number_missed = measurement.sequence_number - sequence_numbers[sensor_address] - 1
-    if number_missed < 0:
-        number_missed += 256
-    group_key = f"bridge-{bridge_address}-sensor-{sensor_address}"
-    if sensor_address not in existing_feeds:
-        create_group(f"Bridge {bridge_address} Sensor {sensor_address}")
-        create_feed(group_key, "Missed Message Count")
-        existing_feeds[sensor_address] = ["missed-message-count"]
-
-    data = [{"key": "missed-message-count", "value": number_missed}]
-    for attribute in dir(measurement.__class__):
-        attribute_instance = getattr(measurement.__class__, attribute)
-        if issubclass(attribute_instance.__class__, ManufacturerDataField):
-            if attribute != "sequence_number":
-                values = getattr(measurement, attribute)
-                if values is not None:
-                    data.extend(convert_to_feed_data(values, attribute, attribute_instance))
-
-    for feed_data in data:
-        if feed_data["key"] not in existing_feeds[sensor_address]:
-            create_feed(group_key, feed_data["key"])
-            existing_feeds[sensor_address].append(feed_data["key"])
-
-    start_time = time.monotonic()
-    print(group_key, data)
-    # Only update the previous sequence if we logged successfully.
-    if create_data(group_key, data):
-        sequence_numbers[sensor_address] = measurement.sequence_number
-
-    duration = time.monotonic() - start_time
-    print(f"Done logging measurement to IO. Took {duration} seconds")
-    print()
+    for packet in scan_response_merger.add(advertisement):
+        reversed_address = [packet.address.address_bytes[i] for i in range(5, -1, -1)]
+        sensor_address = "{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}".format(*reversed_address)
+        number_missed = sequence_tracker.missed(sensor_address, packet)
+        # Skip if we are getting the same broadcast more than once.
+        if number_missed is None:
+            continue
+        number_missed += carried_missed.pop(sensor_address, 0)
+        measurement = packet
+        recovered = fragment_recovery.add(packet)
+        if recovered is not None:
+            # Post the fragment rebuilt from the repair packets in place of the repair packet.
+            measurement = recovered
+        elif not serializer.feed_keys(packet):
+            # Repair packets carry no feeds of their own, so only note that they were received.
+            sequence_tracker.update(sensor_address, packet)
+            carried_missed[sensor_address] = number_missed
+            continue
+        received = time.time()
+        taken_at = clock_aligner.taken_at(sensor_address, measurement, received)
+        created_at = None
+        if taken_at is not None:
+            sample_ages.add(received - taken_at)
+            created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(taken_at))
+        group_key = f"bridge-{bridge_address}-sensor-{sensor_address}"
+        if sensor_address not in existing_feeds:
+            create_group(f"Bridge {bridge_address} Sensor {sensor_address}")
+            create_feed(group_key, "Missed Message Count")
+            existing_feeds[sensor_address] = ["missed-message-count"]
+
+        for feed_key in serializer.feed_keys(measurement):
+            if feed_key not in existing_feeds[sensor_address]:
+                create_feed(group_key, feed_key)
+                existing_feeds[sensor_address].append(feed_key)
+        body = serializer.serialize(
+            measurement, missed_message_count=number_missed, created_at=created_at
+        )
+
+        start_time = time.monotonic()
+        print(group_key, str(body, "utf-8"))
+        # Only update the previous sequence if we logged successfully.
+        if create_data(group_key, body):
+            sequence_tracker.update(sensor_address, packet)
+            if taken_at is not None:
+                end_to_end_latencies.add(time.time() - taken_at)
+
+        duration = time.monotonic() - start_time
+        print(f"Done logging measurement to IO. Took {duration} seconds")
+        if sample_ages.total:
+            print("Sample age:", sample_ages)
+            print("End to end latency:", end_to_end_latencies)
+        print()
 
 print("scan done")
@@ -0,0 +1,202 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+"""This example bridges from BLE to Adafruit IO on a Raspberry Pi at a site with several bridges.
+The bridges share sensor ownership through an SQLite file on a shared drive so that each reading
+is only uploaded once, by the bridge that hears the sensor best."""
+
+import sqlite3
+import time
+from os import getenv
+
+import adafruit_ble
+import requests
+from adafruit_blinka import load_settings_toml
+
+import adafruit_ble_broadcastnet
+import adafruit_ble_broadcastnet_bridge
+
+# Get Adafruit IO keys, ensure these are setup in settings.toml
+# (visit io.adafruit.com if you need to create an account, or if you need your Adafruit IO key.)
+load_settings_toml()
+aio_username = getenv("ADAFRUIT_AIO_USERNAME")
+aio_key = getenv("ADAFRUIT_AIO_KEY")
+# Every bridge on the site must use the same file.
+coordination_file = getenv("BROADCASTNET_COORDINATION_FILE", "broadcastnet.sqlite")
+
+aio_auth_header = {"X-AIO-KEY": aio_key}
+aio_data_header = {"X-AIO-KEY": aio_key, "Content-Type": "application/json"}
+aio_base_url = f"https://io.adafruit.com/api/v2/{aio_username}"
+
+
+class SQLiteBackend:
+    """Shares bridge scores and claimed readings through an SQLite file."""
+
+    def __init__(self, filename):
+        self._db = sqlite3.connect(filename, timeout=10, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scores "
+            "(sensor TEXT, bridge TEXT, score REAL, updated REAL, PRIMARY KEY (sensor, bridge))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS claims "
+            "(sensor TEXT, reading INTEGER, claimed REAL, PRIMARY KEY (sensor, reading))"
+        )
+
+    def update(self, sensor, bridge, score, now):
+        self._db.execute(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", (sensor, bridge, score, now)
+        )
+
+    def scores(self, sensor, since):
+        rows = self._db.execute(
+            "SELECT bridge, score FROM scores WHERE sensor = ? AND updated > ?", (sensor, since)
+        )
+        return dict(rows)
+
+    def claim(self, sensor, reading, now, since):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute("DELETE FROM claims WHERE claimed <= ?", (since,))
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO claims VALUES (?, ?, ?)", (sensor, reading, now)
+            )
+            claimed = cursor.rowcount == 1
+        finally:
+            self._db.execute("COMMIT")
+        return claimed
+
+    def release(self, sensor, reading):
+        self._db.execute("DELETE FROM claims WHERE sensor = ? AND reading = ?", (sensor, reading))
+
+
+def aio_post(path, **kwargs):
+    kwargs["headers"] = aio_auth_header
+    return requests.post(aio_base_url + path, **kwargs)
+
+
+def aio_get(path, **kwargs):
+    kwargs["headers"] = aio_auth_header
+    return requests.get(aio_base_url + path, **kwargs)
+
+
+def create_group(name):
+    response = aio_post("/groups", json={"name": name})
+    if response.status_code != 201:
+        print(name)
+        print(response.content)
+        print(response.status_code)
+        raise RuntimeError("unable to create new group")
+    return response.json()["key"]
+
+
+def create_feed(group_key, name):
+    response = aio_post(f"/groups/{group_key}/feeds", json={"feed": {"name": name}})
+    if response.status_code != 201:
+        print(name)
+        print(response.content)
+        print(response.status_code)
+        raise RuntimeError("unable to create new feed")
+    return response.json()["key"]
+
+
+def create_data(group_key, body):
+    response = requests.post(
+        aio_base_url + f"/groups/{group_key}/data", data=bytes(body), headers=aio_data_header
+    )
+    if response.status_code == 429:
+        print("Throttled!")
+        return False
+    if response.status_code != 200:
+        print(response.status_code, response.json())
+        raise RuntimeError("unable to create new data")
+    response.close()
+    return True
+
+
+def upload(sensor_address, measurement):
+    group_key = f"sensor-{sensor_address}"
+    if sensor_address not in existing_feeds:
+        create_group(f"Sensor {sensor_address}")
+        existing_feeds[sensor_address] = []
+
+    for feed_key in serializer.feed_keys(measurement):
+        if feed_key not in existing_feeds[sensor_address]:
+            create_feed(group_key, feed_key)
+            existing_feeds[sensor_address].append(feed_key)
+    body = serializer.serialize(measurement)
+
+    start_time = time.monotonic()
+    print(group_key, str(body, "utf-8"))
+    if not create_data(group_key, body):
+        # Let this or another bridge try again once the throttling has passed.
+        coordinator.release(sensor_address, measurement)
+        return
+
+    duration = time.monotonic() - start_time
+    print(f"Done logging measurement to IO. Took {duration} seconds")
+    print()
+
+
+ble = adafruit_ble.BLERadio()
+bridge_address = adafruit_ble_broadcastnet.device_address
+print("This is BroadcastNet bridge:", bridge_address)
+print()
+
+coordinator = adafruit_ble_broadcastnet_bridge.BridgeCoordinator(
+    SQLiteBackend(coordination_file), bridge_address
+)
+
+print("Fetching existing feeds.")
+
+# Groups are shared by all bridges so they are named after the sensor only.
+existing_feeds = {}
+response = aio_get("/groups")
+for group in response.json():
+    if "-" not in group["key"]:
+        continue
+    pieces = group["key"].split("-")
+    if len(pieces) != 2 or pieces[0] != "sensor":
+        continue
+    _, sensor_address = pieces
+    existing_feeds[sensor_address] = []
+    for feed in group["feeds"]:
+        feed_key = feed["key"].split(".")[-1]
+        existing_feeds[sensor_address].append(feed_key)
+
+print(existing_feeds)
+
+serializer = adafruit_ble_broadcastnet_bridge.FeedSerializer()
+
+print("scanning")
+print()
+sequence_tracker = adafruit_ble_broadcastnet_bridge.SequenceTracker()
+# Scan responses carry the same sequence number as their advertisement so join them up
+# before checking the sequence number.
+scan_response_merger = adafruit_ble_broadcastnet_bridge.ScanResponseMerger()
+# By providing Advertisement as well we include everything, not just specific advertisements.
+for advertisement in ble.start_scan(
+    adafruit_ble_broadcastnet.AdafruitSensorMeasurement, interval=0.5
+):
+    for measurement in scan_response_merger.add(advertisement):
+        reversed_address = [measurement.address.address_bytes[i] for i in range(5, -1, -1)]
+        sensor_address = "{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}".format(*reversed_address)
+        number_missed = sequence_tracker.missed(sensor_address, measurement)
+        # Skip if we are getting the same broadcast more than once.
+        if number_missed is None:
+            continue
+        sequence_tracker.update(sensor_address, measurement)
+
+        coordinator.observe(sensor_address, measurement.rssi, number_missed)
+        # Repair packets carry no feeds of their own.
+        if not serializer.feed_keys(measurement):
+            continue
+        if coordinator.should_upload(sensor_address, measurement):
+            upload(sensor_address, measurement)
+
+    # Upload the readings that the owning bridge seems to have missed or were throttled.
+    for sensor_address, measurement in coordinator.overdue():
+        print("Retrying a reading from", sensor_address)
+        upload(sensor_address, measurement)
+
+print("scan done")
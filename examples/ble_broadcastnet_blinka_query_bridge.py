@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+"""This example keeps recent sensor readings in memory on a Raspberry Pi and answers queries from
+local programs, such as dashboards or alerting, over a TCP socket on localhost. Each query is one
+line and each answer is one line of JSON:
+
+    latest temperature
+    history 0123456789ab temperature-0 600
+
+The first returns the newest temperature of every sensor and the second returns the last ten
+minutes of one sensor feed. Try it with ``nc localhost 8266``."""
+
+import json
+import socketserver
+import threading
+import time
+
+import adafruit_ble
+
+import adafruit_ble_broadcastnet
+import adafruit_ble_broadcastnet_bridge
+
+QUERY_PORT = 8266
+
+index = adafruit_ble_broadcastnet_bridge.MeasurementIndex(history=128)
+index_lock = threading.Lock()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            query = line.decode("utf-8", "replace").split()
+            with index_lock:
+                if len(query) == 2 and query[0] == "latest":
+                    answer = index.latest(query[1])
+                elif len(query) == 4 and query[0] == "history":
+                    try:
+                        since = time.time() - float(query[3])
+                    except ValueError:
+                        answer = {"error": "seconds must be a number"}
+                    else:
+                        answer = index.history(query[1], query[2], since)
+                elif query == ["sensors"]:
+                    answer = index.sensors()
+                else:
+                    answer = {"error": "unknown query"}
+            self.wfile.write(json.dumps(answer).encode("utf-8") + b"\n")
+
+
+server = socketserver.ThreadingTCPServer(("localhost", QUERY_PORT), QueryHandler)
+server.daemon_threads = True
+threading.Thread(target=server.serve_forever, daemon=True).start()
+print("Answering queries on port", QUERY_PORT)
+
+ble = adafruit_ble.BLERadio()
+print("This is BroadcastNet bridge:", adafruit_ble_broadcastnet.device_address)
+print()
+
+print("scanning")
+print()
+sequence_tracker = adafruit_ble_broadcastnet_bridge.SequenceTracker()
+# Scan responses carry the same sequence number as their advertisement so join them up
+# before checking the sequence number.
+scan_response_merger = adafruit_ble_broadcastnet_bridge.ScanResponseMerger()
+for advertisement in ble.start_scan(
+    adafruit_ble_broadcastnet.AdafruitSensorMeasurement, interval=0.5
+):
+    for measurement in scan_response_merger.add(advertisement):
+        reversed_address = [measurement.address.address_bytes[i] for i in range(5, -1, -1)]
+        sensor_address = "{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}".format(*reversed_address)
+        # Skip if we are getting the same broadcast more than once.
+        if sequence_tracker.missed(sensor_address, measurement) is None:
+            continue
+        sequence_tracker.update(sensor_address, measurement)
+        with index_lock:
+            index.add(sensor_address, measurement)
+
+print("scan done")
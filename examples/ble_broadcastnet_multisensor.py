@@ -3,8 +3,6 @@
 
 """This is a complex sensor node that uses the sensors on a Clue and Feather Bluefruit Sense."""
 
-import time
-
 import adafruit_bmp280
 
 # import adafruit_apds9960.apds9960
@@ -37,13 +35,20 @@ sht31d = adafruit_sht31d.SHT31D(i2c)
 # Barometric pressure sensor:
 bmp280 = adafruit_bmp280.Adafruit_BMP280_I2C(i2c)
 
+# Report every 60 seconds in a slot picked from our address, so sensors that power up together
+# don't keep colliding. The measurement below is split into four packets of 0.1 seconds plus
+# jitter, so each report takes about half a second.
+timer = adafruit_ble_broadcastnet.BroadcastTimer(60, report_time=0.5)
+
 while True:
+    timer.wait()
     measurement = adafruit_ble_broadcastnet.AdafruitSensorMeasurement()
+    measurement.timestamp = adafruit_ble_broadcastnet.uptime_ms()
     measurement.temperature = (sht31d.temperature, bmp280.temperature)
     measurement.relative_humidity = sht31d.relative_humidity
     measurement.pressure = bmp280.pressure
     measurement.acceleration = lsm6ds.acceleration
     measurement.magnetic = lis3mdl.magnetic
     print(measurement)
-    adafruit_ble_broadcastnet.broadcast(measurement)
-    time.sleep(60)
+    # The timestamp leaves no room for wide_sequence=True next to the three value fields.
+    adafruit_ble_broadcastnet.broadcast(measurement, jitter=0.05)
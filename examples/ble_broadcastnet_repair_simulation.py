@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+"""This example measures, without sending anything, what repair packets cost and buy. It builds
+the packets that broadcast() would send for a six field measurement, drops each one at random
+and passes the rest through adafruit_ble_broadcastnet_bridge.FragmentRecovery like a bridge
+would, and compares that with broadcasting every packet for twice as long. Losses are
+independent, so bursts of interference will recover less. Run it on a Raspberry Pi or other
+Blinka computer."""
+
+import random
+
+import _bleio  # noqa: PLC2701
+
+import adafruit_ble_broadcastnet
+import adafruit_ble_broadcastnet_bridge
+
+LOSS_RATES = (0.01, 0.05, 0.1, 0.2)
+REPORTS = 2000
+WIDE_SEQUENCE = True
+
+measurement = adafruit_ble_broadcastnet.AdafruitSensorMeasurement()
+measurement.temperature = (21.5, 21.7)
+measurement.relative_humidity = 45.0
+measurement.pressure = 1013.2
+measurement.acceleration = (0.1, 0.2, 9.8)
+measurement.magnetic = (20.0, -5.0, 40.0)
+measurement.light = 300.0
+
+sensor_address = _bleio.Address(bytes(6), _bleio.Address.RANDOM_STATIC)
+
+
+def simulate(loss_rate, mode):
+    """Returns the packets sent per report, the fraction of fragments that arrive or are rebuilt
+    and the fraction of reports that arrive whole. mode is "none", "repair" or "twice", which
+    sends every packet twice as long so that it is lost only if both halves are."""
+    repair = mode == "repair"
+    if mode == "twice":
+        loss_rate *= loss_rate
+    recovery = adafruit_ble_broadcastnet_bridge.FragmentRecovery()
+    sequence_number = 0
+    sent = fragments = delivered = complete = 0
+    for _ in range(REPORTS):
+        packets = adafruit_ble_broadcastnet.build_packets(
+            measurement,
+            sequence_number=sequence_number,
+            repair=repair,
+            wide_sequence=WIDE_SEQUENCE,
+        )
+        sequence_number += len(packets)
+        expected = set()
+        received = set()
+        for packet in packets:
+            is_repair = adafruit_ble_broadcastnet.REPAIR_KEY in packet.manufacturer_data.data
+            if not is_repair:
+                expected.add(packet.sequence_number)
+            if random.random() < loss_rate:
+                continue
+            packet.address = sensor_address
+            if not is_repair:
+                received.add(packet.sequence_number)
+            recovered = recovery.add(packet)
+            if recovered:
+                received.add(recovered.sequence_number)
+        sent += len(packets) * (2 if mode == "twice" else 1)
+        fragments += len(expected)
+        delivered += len(received)
+        complete += received == expected
+    return sent / REPORTS, delivered / fragments, complete / REPORTS
+
+
+# Airtime is relative to sending every packet once without repair.
+print("loss  mode    packets  airtime  fragments  whole reports")
+for loss_rate in LOSS_RATES:
+    plain_packets = None
+    for mode in ("none", "repair", "twice"):
+        packets, fragment_rate, report_rate = simulate(loss_rate, mode)
+        if plain_packets is None:
+            plain_packets = packets
+        overhead = (packets / plain_packets - 1) * 100
+        print(
+            f"{loss_rate * 100:3.0f}%  {mode:6}  {packets:7.1f}  {overhead:+6.0f}%  "
+            f"{fragment_rate * 100:8.1f}%  {report_rate * 100:12.1f}%"
+        )
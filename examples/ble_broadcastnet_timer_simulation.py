@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+"""This example estimates, without any radios, how many reports get through when more and more
+sensors share one interval. A report is counted as lost when it overlaps another sensor's report,
+which is pessimistic because the advertisements of overlapping reports don't always collide. It
+compares reports at a random time in the interval with the slots that
+adafruit_ble_broadcastnet.BroadcastTimer picks by default, for sensors with random addresses and
+for sensors numbered from zero. Run it with CPython to size a deployment before building it."""
+
+import random
+
+INTERVAL = 60
+# broadcast_time of broadcast() and the number of packets each measurement is split into.
+BROADCAST_TIME = 0.1
+FRAGMENTS = 3
+REPORT_TIME = BROADCAST_TIME * FRAGMENTS
+NODE_COUNTS = (25, 50, 100, 200, 400)
+ROUNDS = 200
+
+# BroadcastTimer's defaults for this report time.
+SLOTS = max(1, int(INTERVAL / (4 * REPORT_TIME)))
+SLOT_WIDTH = INTERVAL / SLOTS
+JITTER = SLOT_WIDTH - REPORT_TIME
+
+
+def random_time(nodes):
+    return [random.random() * (INTERVAL - REPORT_TIME) for _ in range(nodes)]
+
+
+def slotted(slots):
+    return [slot * SLOT_WIDTH + random.random() * JITTER for slot in slots]
+
+
+def random_addresses(nodes):
+    # Every round is a new deployment with new addresses.
+    return slotted(random.getrandbits(48) % SLOTS for _ in range(nodes))
+
+
+def numbered_sensors(nodes):
+    return slotted(number % SLOTS for number in range(nodes))
+
+
+def delivery_rate(nodes, report_starts):
+    """Returns the fraction of reports that don't overlap another report."""
+    delivered = 0
+    for _ in range(ROUNDS):
+        starts = sorted(report_starts(nodes))
+        for i, start in enumerate(starts):
+            previous_overlaps = i > 0 and start - starts[i - 1] < REPORT_TIME
+            next_overlaps = i + 1 < len(starts) and starts[i + 1] - start < REPORT_TIME
+            if not (previous_overlaps or next_overlaps):
+                delivered += 1
+    return delivered / (nodes * ROUNDS)
+
+
+print(f"{FRAGMENTS} packets of {BROADCAST_TIME} s every {INTERVAL} s, {SLOTS} slots")
+print("sensors  random time  random addresses  numbered sensors")
+for nodes in NODE_COUNTS:
+    rates = [
+        delivery_rate(nodes, report_starts) * 100
+        for report_starts in (random_time, random_addresses, numbered_sensors)
+    ]
+    print(f"{nodes:7}  {rates[0]:10.1f}%  {rates[1]:15.1f}%  {rates[2]:15.1f}%")